@@ -1,9 +1,10 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils.fetch_stock_data import fetch_stock_data, extract_kpis, create_price_chart, fetch_fundamentals
 from utils.fetch_stock_data import (
     fetch_stock_data,
+    fetch_stocks_data,
     extract_kpis,
     create_price_chart,
     fetch_fundamentals
@@ -21,42 +22,90 @@ class DataAnalystAgent:
 
     
 
-    def analyze_stock(self, stock_symbol, start_date, end_date):
+    def analyze_stock(self, stock_symbol, start_date, end_date, need_full_series=True):
+        """
+        With need_full_series=False only the KPIs are computed: no indicator
+        columns and no charts (chart_path and figure are None).
+        """
+
+        # Price history and fundamentals are independent Yahoo requests;
+        # the chart is rendered while the fundamentals call is still in flight.
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            f_df = ex.submit(fetch_stock_data, stock_symbol, start_date, end_date, need_full_series)
+            f_fund = ex.submit(fetch_fundamentals, stock_symbol)
 
-        df = fetch_stock_data(stock_symbol, start_date, end_date)
-        kpis = extract_kpis(df)
-        chart_path = create_price_chart(df, stock_symbol)
+            df = f_df.result()
+            f_chart = ex.submit(create_price_chart, df, stock_symbol) if need_full_series else None
+            kpis = extract_kpis(df)
 
-        fundamentals = fetch_fundamentals(stock_symbol)
+            chart_path = f_chart.result() if f_chart else None
+            fundamentals = f_fund.result()
 
         return {
             "dataframe": df,
             "kpis": kpis,
             "fundamentals": fundamentals,
-            "chart_path": chart_path
+            "chart_path": chart_path,  # static JPEG, embedded in the PDF
+            "figure": self.generate_chart(df, stock_symbol) if need_full_series else None,  # interactive, for Streamlit
     }
 
 
 
-    def generate_chart(self, df: pd.DataFrame, symbol: str) -> str:
+    async def aanalyze_stock(self, stock_symbol, start_date, end_date, need_full_series=True):
         """
-        Generates a price + moving average chart.
-        Saves it to /data/raw and returns path.
+        Awaitable `analyze_stock`; runs in a worker thread so the event loop
+        can drive other pipeline stages meanwhile.
+        """
+        return await asyncio.to_thread(self.analyze_stock, stock_symbol, start_date, end_date, need_full_series)
+
+    def analyze_stocks(self, stock_symbols, start_date, end_date):
         """
-        plt.figure(figsize=(10, 5))
-        plt.plot(df["Date"], df["Close"], label="Close Price")
-        plt.plot(df["Date"], df["MA20"], label="20-Day MA")
-        plt.plot(df["Date"], df["MA50"], label="50-Day MA")
-        plt.legend()
-        plt.title(f"{symbol} Price with Moving Averages")
-        plt.xlabel("Date")
-        plt.ylabel("Price")
-
-        chart_path = os.path.join(self.output_dir, f"{symbol}_chart.png")
-        plt.savefig(chart_path, dpi=300)
-        plt.close()
-
-        return chart_path
+        Watchlist version of `analyze_stock`: one batched price download for
+        all symbols, fundamentals fetched concurrently while it runs.
+        Returns {symbol: analysis} keyed by the upper-cased symbol; symbols
+        without price data are left out.
+        """
+        stock_symbols = list(dict.fromkeys(s.strip().upper() for s in stock_symbols))
+
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            f_funds = {s: ex.submit(fetch_fundamentals, s) for s in stock_symbols}
+            frames = fetch_stocks_data(stock_symbols, start_date, end_date)
+
+            # Charts use no shared pyplot state, so they render concurrently
+            f_charts = {s: ex.submit(create_price_chart, df, s) for s, df in frames.items()}
+
+            results = {}
+            for symbol, df in frames.items():
+                results[symbol] = {
+                    "dataframe": df,
+                    "kpis": extract_kpis(df),
+                    "fundamentals": f_funds[symbol].result(),
+                    "chart_path": f_charts[symbol].result(),
+                    "figure": self.generate_chart(df, symbol),
+                }
+
+        return results
+
+
+
+    def generate_chart(self, df: pd.DataFrame, symbol: str) -> "go.Figure":
+        """
+        Builds an interactive price + moving average chart.
+        Rendered by Streamlit directly, no image encoding or disk round-trip.
+        """
+        import plotly.graph_objects as go  # deferred: only needed once a chart is built
+
+        fig = go.Figure()
+        fig.add_scatter(x=df.index, y=df["Close"], name="Close Price")
+        fig.add_scatter(x=df.index, y=df["MA20"], name="20-Day MA")
+        fig.add_scatter(x=df.index, y=df["MA50"], name="50-Day MA")
+        fig.update_layout(
+            title=f"{symbol} Price with Moving Averages",
+            xaxis_title="Date",
+            yaxis_title="Price",
+        )
+
+        return fig
 
 
 # Smoke test when run directly
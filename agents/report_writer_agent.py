@@ -1,64 +1,64 @@
 import os
-import requests
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Iterator, Tuple
 
-# Load OpenRouter API key
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-
-
-class ReportWriterAgent:
-    """
-    Generates a clean, factual, structured financial analysis report
-    using Google's Gemma 3 12B via OpenRouter.
-    """
+import orjson
 
-    def __init__(self, model="google/gemma-3-12b-it"):
-        self.model = model
-        self.endpoint = "https://openrouter.ai/api/v1/chat/completions"
-
-    # Format news nicely before passing to LLM
-    def _format_news_section(self, news_items: List[Dict[str, Any]]) -> str:
-        lines = []
-        for i, item in enumerate(news_items, 1):
-            title = item.get("title", "")
-            sentiment = item.get("sentiment", {}).get("label", "neutral")
-            url = item.get("url", "")
-            lines.append(
-                f"{i}. {title}\n   Sentiment: {sentiment}\n   Link: {url}"
-            )
-        return "\n".join(lines)
+from utils.http_session import create_session
 
-    # Core method to generate report
-    def write_report(
-        self,
-        stock_symbol: str,
-        kpis: Dict[str, Any],
-        news_items: List[Dict[str, Any]],
-        sentiment_summary: Dict[str, Any],
-        chart_path: str,
-        start_date: str,
-        end_date: str,
-        fundamentals: Dict[str, Any] = None
-    ) -> str:
-
-        fundamentals = fundamentals or {}
-        news_section = self._format_news_section(news_items)
-
-        # Optimized no-hallucination prompt for Gemma-3 12B
-        prompt = f"""
+# Load provider API keys
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Both providers speak the OpenAI chat-completions protocol;
+# a backend only decides where the request goes and which key signs it.
+BACKENDS = {
+    "openrouter": {
+        "label": "OpenRouter",
+        "endpoint": "https://openrouter.ai/api/v1/chat/completions",
+        "api_key": OPENROUTER_API_KEY,
+    },
+    "openai": {
+        "label": "OpenAI",
+        "endpoint": "https://api.openai.com/v1/chat/completions",
+        "api_key": OPENAI_API_KEY,
+    },
+}
+
+# (connect, read) seconds. The read timeout bounds the gap between bytes,
+# so long streamed generations are fine but a stalled connection is not.
+REQUEST_TIMEOUT = (5, 120)
+
+# Report sections in order: (JSON field, heading)
+REPORT_SECTIONS = [
+    ("executive_summary", "Executive Summary"),
+    ("price_performance", "Price Performance Overview"),
+    ("key_indicators", "Key Indicators (KPIs)"),
+    ("market_sentiment", "Market Sentiment Analysis"),
+    ("fundamental_valuation", "Fundamental Valuation Overview"),
+    ("news_highlights", "Recent News Highlights"),
+    ("risks_and_opportunities", "Risks and Opportunities"),
+    ("final_recommendation", "Final Recommendation"),
+]
+
+# Free-form markdown output (streamed to the UI)
+TEXT_OUTPUT_FORMAT = "Follow EXACTLY this structure:\n\n" + "\n".join(
+    f"{i}. {title}" for i, (_, title) in enumerate(REPORT_SECTIONS, 1)
+)
+
+# JSON-mode output: the model skips re-emitting headings; they are added back locally
+JSON_OUTPUT_FORMAT = (
+    "Return ONLY a JSON object with exactly these string fields, one per report section:\n"
+    + "\n".join(f"- {key}: {title}" for key, title in REPORT_SECTIONS)
+    + "\nDo not repeat the section titles inside the values."
+)
+
+# Optimized no-hallucination prompt for Gemma-3 12B
+PROMPT_TEMPLATE = """
 You are a professional financial analyst. Write a clean, factual, structured equity-research report 
 for **{stock_symbol}**, analyzing the period **{start_date} → {end_date}**.
 
-Follow EXACTLY this structure:
-
-1. Executive Summary  
-2. Price Performance Overview  
-3. Key Indicators (KPIs)  
-4. Market Sentiment Analysis  
-5. Fundamental Valuation Overview  
-6. Recent News Highlights  
-7. Risks and Opportunities  
-8. Final Recommendation  
+{output_format}
 
 Use ONLY the data provided below. Never invent values.
 
@@ -85,36 +85,261 @@ STRICT RULES:
 - Do NOT over-speculate; conclusions must follow from provided data.
 """
 
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+# Constant for every request, so it is built once at import
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "You are a senior financial analyst. "
+        "You write precise, factual, structured reports. "
+        "You strictly avoid inventing any information."
+    ),
+}
+
+
+def _compact_json(data: Dict[str, Any]) -> str:
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY, default=str).decode()
+
+
+# Section values that are not plain strings (nested objects, numbers) as readable JSON
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value).decode()
+
+
+class ReportWriterAgent:
+    """
+    Generates a clean, factual, structured financial analysis report.
+    Defaults to Google's Gemma 3 12B via OpenRouter; `backend="openai"`
+    sends the same request to OpenAI instead.
+
+    The two entry points produce differently shaped reports:
+    `write_report` (Orchestrator.run) requests JSON-mode sections and
+    renders them as numbered plain text with "Not available." for empty
+    sections, while `stream_report` (the Streamlit app) yields the model's
+    free-form markdown. Their request bodies differ, so they are cached
+    separately.
+    """
+
+    def __init__(self, model="google/gemma-3-12b-it", backend="openrouter", cache_dir="data/llm_cache"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+
+        self.model = model
+        self.backend = backend
+        self.endpoint = BACKENDS[backend]["endpoint"]
+        self._session = create_session()
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Identical requests (same endpoint, model, prompt, sampling) reuse the stored report
+    def _cache_path(self, body: Dict[str, Any]) -> str:
+        key = hashlib.sha256(
+            orjson.dumps([self.endpoint, body], option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.md")
+
+    def _load_cached(self, path: str):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _store_cached(self, path: str, report: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        os.replace(tmp_path, path)
+
+    # Format news nicely before passing to LLM
+    def _format_news_section(self, news_items: List[Dict[str, Any]]) -> str:
+        return "\n".join(
+            f"{i}. {item.get('title', '')}\n"
+            f"   Sentiment: {(item.get('sentiment') or {}).get('label', 'neutral')}\n"
+            f"   Link: {item.get('url', '')}"
+            for i, item in enumerate(news_items, 1)
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {BACKENDS[self.backend]['api_key']}",
             "Content-Type": "application/json",
         }
 
-        body = {
+    # Turn a JSON-mode reply into the numbered plain-text report used by the PDF.
+    # Returns (report, has_content); has_content is False when nothing was filled in.
+    def _render_sections(self, content: str) -> Tuple[str, bool]:
+        try:
+            sections = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            sections = None  # model ignored JSON mode
+        if not isinstance(sections, dict) or not any(key in sections for key, _ in REPORT_SECTIONS):
+            # Not our schema: keep the model's text as-is rather than drop it
+            return content, bool(content.strip())
+
+        blocks = []
+        has_content = False
+        for i, (key, title) in enumerate(REPORT_SECTIONS, 1):
+            value = sections.get(key)
+            if isinstance(value, list):  # some models answer with bullet arrays
+                value = "\n".join(f"- {_as_text(v)}" for v in value)
+            elif value is not None:
+                value = _as_text(value)
+            if value and value.strip():
+                has_content = True
+            else:
+                value = "Not available."
+            blocks.append(f"{i}. {title}\n{value}")
+        return "\n\n".join(blocks), has_content
+
+    # Build the chat-completion request body shared by write_report / stream_report
+    def _build_body(
+        self,
+        stock_symbol: str,
+        kpis: Dict[str, Any],
+        news_items: List[Dict[str, Any]],
+        sentiment_summary: Dict[str, Any],
+        chart_path: str,
+        start_date: str,
+        end_date: str,
+        fundamentals: Dict[str, Any] = None,
+        json_mode: bool = False
+    ) -> Dict[str, Any]:
+
+        fundamentals = fundamentals or {}
+        news_section = self._format_news_section(news_items)
+        output_format = JSON_OUTPUT_FORMAT if json_mode else TEXT_OUTPUT_FORMAT
+
+        prompt = PROMPT_TEMPLATE.format_map({
+            "stock_symbol": stock_symbol,
+            "start_date": start_date,
+            "end_date": end_date,
+            "output_format": output_format,
+            # Compact JSON: fewer tokens than a Python dict repr
+            "kpis": _compact_json(kpis),
+            "fundamentals": _compact_json(fundamentals),
+            "sentiment_summary": _compact_json(sentiment_summary),
+            "news_section": news_section,
+            "chart_path": chart_path,
+        })
+
+
+        return {
             "model": self.model,
             "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a senior financial analyst. "
-                        "You write precise, factual, structured reports. "
-                        "You strictly avoid inventing any information."
-                    ),
-                },
+                SYSTEM_MESSAGE,
                 {"role": "user", "content": prompt},
             ],
             "temperature": 0.05,      # For maximum factual accuracy
             "max_tokens": 2200,
+            **({"response_format": {"type": "json_object"}} if json_mode else {}),
         }
 
-        response = requests.post(self.endpoint, headers=headers, json=body)
+    # Core method to generate report
+    def write_report(
+        self,
+        stock_symbol: str,
+        kpis: Dict[str, Any],
+        news_items: List[Dict[str, Any]],
+        sentiment_summary: Dict[str, Any],
+        chart_path: str,
+        start_date: str,
+        end_date: str,
+        fundamentals: Dict[str, Any] = None
+    ) -> str:
+
+        body = self._build_body(
+            stock_symbol, kpis, news_items, sentiment_summary,
+            chart_path, start_date, end_date, fundamentals,
+            json_mode=True
+        )
+
+        cache_path = self._cache_path(body)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            return cached
+
+        response = self._session.post(
+            self.endpoint,
+            headers=self._headers(),
+            data=orjson.dumps(body),
+            timeout=REQUEST_TIMEOUT,
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"{BACKENDS[self.backend]['label']} API error {response.status_code}: {response.text}"
+            )
+
+        content = orjson.loads(response.content)["choices"][0]["message"]["content"]
+        report, has_content = self._render_sections(content)
+        if has_content:  # an empty report would otherwise be served for these inputs forever
+            self._store_cached(cache_path, report)
+        return report
+
+    # Free-form markdown report, yielded token by token as the backend emits it (SSE)
+    def stream_report(
+        self,
+        stock_symbol: str,
+        kpis: Dict[str, Any],
+        news_items: List[Dict[str, Any]],
+        sentiment_summary: Dict[str, Any],
+        chart_path: str,
+        start_date: str,
+        end_date: str,
+        fundamentals: Dict[str, Any] = None
+    ) -> Iterator[str]:
+
+        body = self._build_body(
+            stock_symbol, kpis, news_items, sentiment_summary,
+            chart_path, start_date, end_date, fundamentals
+        )
+
+        # Keyed without the stream flag; write_report's JSON-mode body differs,
+        # so this never returns its rendered sections
+        cache_path = self._cache_path(body)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            yield cached
+            return
+
+        response = self._session.post(
+            self.endpoint,
+            headers=self._headers(),
+            data=orjson.dumps({**body, "stream": True}),
+            stream=True,
+            timeout=REQUEST_TIMEOUT,
+        )
 
         if response.status_code != 200:
             raise RuntimeError(
-                f"OpenRouter API error {response.status_code}: {response.text}"
+                f"{BACKENDS[self.backend]['label']} API error {response.status_code}: {response.text}"
             )
 
-        return response.json()["choices"][0]["message"]["content"]
+        parts = []
+        with response:
+            for line in response.iter_lines():
+                # Blank keep-alives and ": OPENROUTER PROCESSING" comments carry no data
+                if not line.startswith(b"data: "):
+                    continue
+
+                payload = line[len(b"data: "):]
+                if payload == b"[DONE]":
+                    break
+
+                chunk = orjson.loads(payload)
+                if "error" in chunk:
+                    raise RuntimeError(f"{BACKENDS[self.backend]['label']} stream error: {chunk['error']}")
+
+                choices = chunk.get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        report = "".join(parts)
+        if report.strip():  # an empty stream would otherwise be replayed for these inputs forever
+            self._store_cached(cache_path, report)
 
 
 # Smoke test (python -m agents.report_writer_agent)
@@ -158,7 +383,7 @@ if __name__ == "__main__":
         fundamentals=sample_fundamentals,
         news_items=sample_news,
         sentiment_summary=sample_sent,
-        chart_path="data/raw/TCS.NS_chart.png",
+        chart_path="data/raw/TCS.NS_2024-01-01_2024-12-30_chart.jpg",
         start_date="2024-01-01",
         end_date="2024-12-31",
     )
@@ -1,26 +1,39 @@
 # agents/researcher_agent.py
+import asyncio
 import os
-import requests
-import feedparser
+import numpy as np
+import orjson
+import xml.etree.ElementTree as ET
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 from typing import List, Dict, Any
 from urllib.parse import quote_plus
 
-from utils.sentiment_analysis import simple_sentiment
+from utils.http_session import create_session
+from utils.sentiment_batch import score_many
 
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")  # optional: set this in your env for better results
 
+
+# Apps re-query the same few symbols; encode each query's feed URL once
+@lru_cache(maxsize=4096)
+def _rss_url(query: str) -> str:
+    return f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en"
+
+
 class ResearcherAgent:
     """
     ResearcherAgent:
       - fetches news for a given stock/company/query
-      - computes basic sentiment per article using utils.sentiment_analysis.simple_sentiment
+      - computes basic sentiment per article using utils.sentiment_batch.score_many
       - returns a list of news dicts
     """
 
     def __init__(self, source="auto", max_articles=10):
         self.max_articles = max_articles
         self.source = source  # 'newsapi'|'rss'|'auto'
+        self._session = create_session()
 
     def _fetch_news_newsapi(self, query: str) -> List[Dict[str, Any]]:
         if not NEWSAPI_KEY:
@@ -33,13 +46,16 @@ class ResearcherAgent:
             "language": "en",
             "apiKey": NEWSAPI_KEY,
         }
-        resp = requests.get(url, params=params, timeout=15)
+        resp = self._session.get(url, params=params, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
+        articles = data.get("articles", [])[: self.max_articles]
+
+        texts = [(a.get("title") or "") + " " + (a.get("description") or "") for a in articles]
+        sentiments = score_many(texts)
+
         results = []
-        for a in data.get("articles", [])[: self.max_articles]:
-            text = (a.get("title") or "") + " " + (a.get("description") or "")
-            sentiment = simple_sentiment(text)
+        for a, sentiment in zip(articles, sentiments):
             published = a.get("publishedAt")
             results.append({
                 "title": a.get("title"),
@@ -54,30 +70,39 @@ class ResearcherAgent:
 
     def _fetch_news_rss(self, query: str) -> List[Dict[str, Any]]:
         # Use Google News RSS (no API key). Works well for quick prototyping.
-        safe_q = quote_plus(query)
-        rss_url = f"https://news.google.com/rss/search?q={safe_q}&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(rss_url)
+        resp = self._session.get(_rss_url(query), timeout=10)
+        resp.raise_for_status()
+
+        # The feed holds ~100 items; stream-parse <item>s and stop after
+        # max_articles instead of building the whole document.
+        entries = []
+        for _, elem in ET.iterparse(BytesIO(resp.content)):
+            if elem.tag != "item":
+                continue
+            source = elem.find("source")
+            entries.append({
+                "title": elem.findtext("title"),
+                "link": elem.findtext("link"),
+                # Google News descriptions are small HTML snippets
+                "summary": elem.findtext("description") or "",
+                "published": elem.findtext("pubDate"),
+                "source": source.text if source is not None else None,
+            })
+            elem.clear()
+            if len(entries) >= self.max_articles:
+                break
+
+        texts = [f"{entry['title']} {entry['summary']}" for entry in entries]
+        sentiments = score_many(texts)
+
         results = []
-        for entry in feed.entries[: self.max_articles]:
-            title = entry.get("title")
-            link = entry.get("link")
-            summary = entry.get("summary", "")
-            # Some feeds embed HTML — strip minimal tags if present
-            text = f"{title} {summary}"
-            sentiment = simple_sentiment(text)
-            # feedparser dates can vary
-            published = None
-            if "published" in entry:
-                try:
-                    published = entry.published
-                except Exception:
-                    published = None
+        for entry, sentiment in zip(entries, sentiments):
             results.append({
-                "title": title,
-                "description": summary,
-                "url": link,
-                "source": entry.get("source", {}).get("title") or "Google News",
-                "published": published,
+                "title": entry["title"],
+                "description": entry["summary"],
+                "url": entry["link"],
+                "source": entry["source"] or "Google News",
+                "published": entry["published"],
                 "raw": entry,
                 "sentiment": sentiment,
             })
@@ -105,6 +130,13 @@ class ResearcherAgent:
             except Exception:
                 raise RuntimeError(f"Failed to fetch news (tried {mode}). Error: {e}")
 
+    async def agather_news(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Awaitable `gather_news`; runs in a worker thread so the event loop
+        can drive other pipeline stages meanwhile.
+        """
+        return await asyncio.to_thread(self.gather_news, query)
+
     def analyze_sentiment_summary(self, news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Simple aggregate sentiment summary
@@ -112,20 +144,17 @@ class ResearcherAgent:
         if not news_items:
             return {"count": 0, "positive": 0, "negative": 0, "neutral": 0, "avg_polarity": 0.0}
 
-        pos = neg = neu = 0
-        total_p = 0.0
-        for item in news_items:
-            lab = item.get("sentiment", {}).get("label", "neutral")
-            pol = item.get("sentiment", {}).get("polarity", 0.0)
-            total_p += pol
-            if lab == "positive":
-                pos += 1
-            elif lab == "negative":
-                neg += 1
-            else:
-                neu += 1
+        n = len(news_items)
+        sentiments = [item.get("sentiment") or {} for item in news_items]
+        labels = np.fromiter((s.get("label", "neutral") for s in sentiments), dtype="U8", count=n)
+        polarities = np.fromiter((s.get("polarity", 0.0) for s in sentiments), dtype=np.float64, count=n)
+
+        # Anything that is not positive/negative counts as neutral
+        pos = int(np.count_nonzero(labels == "positive"))
+        neg = int(np.count_nonzero(labels == "negative"))
+        neu = n - pos - neg
 
-        avg = round(total_p / max(1, len(news_items)), 4)
+        avg = round(float(polarities.mean()), 4)
         return {"count": len(news_items), "positive": pos, "negative": neg, "neutral": neu, "avg_polarity": avg}
 
 # Quick manual smoke-run when executed directly
@@ -1,7 +1,7 @@
 import streamlit as st
-from orchestrator import Orchestrator
 import base64
 import os
+from datetime import datetime
 
 # ------------------------ STREAMLIT CONFIG ------------------------
 st.set_page_config(
@@ -24,18 +24,44 @@ end_date = st.sidebar.date_input("End Date")
 run_btn = st.sidebar.button("🚀 Run Analysis")
 
 
+# One Orchestrator per server process: agents and their pooled HTTP
+# sessions survive Streamlit reruns instead of being rebuilt each time.
+# Imported here, so the page renders before the agents' dependencies
+# (pandas, yfinance, numba, textblob, fpdf) are loaded.
+@st.cache_resource
+def get_orchestrator():
+    from orchestrator import Orchestrator
+    return Orchestrator()
+
+
+# Re-running the same symbol + date range returns the stored data instead of
+# repeating every fetch (the report itself is cached by ReportWriterAgent).
+# Failures are raised, so they are never cached.
+@st.cache_data(ttl=3600, show_spinner=False)
+def gather_inputs(_orchestrator, stock_symbol: str, start_date: str, end_date: str) -> dict:
+    return _orchestrator.gather(
+        stock_symbol=stock_symbol,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
 # ------------------------ MAIN EXECUTION ------------------------
 if run_btn:
     st.subheader(f"🚀 Running Analysis for **{stock_symbol}**")
 
-    orchestrator = Orchestrator()
+    orchestrator = get_orchestrator()
 
-    with st.spinner("Fetching data, analyzing trends, generating report..."):
-        result = orchestrator.run(
-            stock_symbol=stock_symbol,
-            start_date=str(start_date),
-            end_date=str(end_date)
-        )
+    with st.spinner("Fetching data, analyzing trends..."):
+        try:
+            result = gather_inputs(
+                orchestrator,
+                stock_symbol=stock_symbol,
+                start_date=str(start_date),
+                end_date=str(end_date)
+            )
+        except Exception as e:
+            result = {"error": str(e)}
 
     # -------------------------------------------------------------
     # ERROR HANDLING
@@ -44,7 +70,7 @@ if run_btn:
         st.error(f"❌ Error: {result['error']}")
         st.stop()
 
-    st.success("✅ Analysis Completed Successfully")
+    st.success("✅ Data Collected Successfully")
 
     # -------------------------------------------------------------
     # 1. KPIs SECTION
@@ -89,10 +115,13 @@ if run_btn:
     # 3. CHART SECTION
     # -------------------------------------------------------------
     st.header("📈 Price Chart")
+    figure = result.get("figure")
     chart_path = result.get("chart_path")
 
-    if chart_path and os.path.exists(chart_path):
-        st.image(chart_path, use_container_width=True)
+    if figure is not None:
+        st.plotly_chart(figure, width="stretch")
+    elif chart_path and os.path.exists(chart_path):
+        st.image(chart_path, width="stretch")
     else:
         st.warning("⚠️ Chart image missing.")
 
@@ -116,24 +145,43 @@ if run_btn:
     # -------------------------------------------------------------
     st.header("📝 AI-Generated Financial Report")
 
-    report_text = result.get("report_text", "")
-    st.write(report_text)
+    # Tokens are rendered as the LLM produces them
+    try:
+        report_text = st.write_stream(
+            orchestrator.stream_report(
+                stock_symbol=stock_symbol,
+                start_date=str(start_date),
+                end_date=str(end_date),
+                data=result
+            )
+        )
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
+        st.stop()
 
     # -------------------------------------------------------------
     # 6. PDF DOWNLOAD SECTION
     # -------------------------------------------------------------
     st.header("📄 Download Report PDF")
 
-    pdf_path = result.get("pdf_path")
+    try:
+        pdf_future = orchestrator.submit_pdf(
+            report_text=report_text,
+            chart_path=result.get("chart_path"),
+            stock_symbol=stock_symbol
+        )
+    except Exception:
+        pdf_future = None
 
-    if pdf_path and os.path.exists(pdf_path):
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
+    if pdf_future is not None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
         st.download_button(
             label="⬇ Download Full PDF Report",
-            data=pdf_bytes,
-            file_name=os.path.basename(pdf_path),
+            # Rendered on the orchestrator's PDF thread while the page
+            # finishes; the button only waits for the bytes when clicked
+            data=pdf_future.result,
+            file_name=f"REPORT_{stock_symbol}_{timestamp}.pdf",
             mime="application/pdf"
         )
     else:
@@ -1,4 +1,7 @@
+import asyncio
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
 
 from agents.researcher_agent import ResearcherAgent
 from agents.data_analyst_agent import DataAnalystAgent
@@ -20,69 +23,126 @@ class Orchestrator:
         self.analyst = DataAnalystAgent()
         self.writer = ReportWriterAgent()
         self.pdf = PDFGenerator()
+        # PDFs render on a background thread, so callers get a future and
+        # carry on. One worker: reports are rendered one at a time.
+        self._pdf_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
 
-    def run(self, stock_symbol: str, start_date: str, end_date: str) -> dict:
+    def run(self, stock_symbol: str, start_date: str, end_date: str, persist_pdf: bool = False) -> dict:
         """
         Executes the full multi-agent pipeline and returns
-        all produced data along with final PDF path.
+        all produced data along with the final PDF bytes.
 
         Returns a dict with keys:
             - kpis
             - fundamentals
             - chart_path
+            - figure
             - news_items
             - sentiment_summary
             - report_text
-            - pdf_path
+            - pdf_bytes
+            - pdf_path (only with persist_pdf=True: the copy saved under data/reports)
         """
-        try:
-            print("\n🔍 Step 1: Fetching news...")
-            news_items = self.researcher.gather_news(stock_symbol)
-            sentiment_summary = self.researcher.analyze_sentiment_summary(news_items)
-
-            print("\n📊 Step 2: Fetching stock data & KPIs...")
-            analysis = self.analyst.analyze_stock(stock_symbol, start_date, end_date)
+        return asyncio.run(self.arun(stock_symbol, start_date, end_date, persist_pdf))
 
-            kpis = analysis["kpis"]
-            fundamentals = analysis["fundamentals"]
-            chart_path = analysis["chart_path"]
+    async def arun(self, stock_symbol: str, start_date: str, end_date: str, persist_pdf: bool = False) -> dict:
+        """
+        Async version of `run`. News gathering and stock analysis do not
+        depend on each other, so they are executed concurrently; the report
+        and PDF steps wait for both.
+        """
+        try:
+            data = await self.agather(stock_symbol, start_date, end_date)
 
-            print("\n📝 Step 3: Generating financial report...")
-            report_text = self.writer.write_report(
+            print("\n📝 Step 2: Generating financial report...")
+            report_text = await asyncio.to_thread(
+                self.writer.write_report,
                 stock_symbol=stock_symbol,
-                kpis=kpis,
-                fundamentals=fundamentals,
-                news_items=news_items,
-                sentiment_summary=sentiment_summary,
-                chart_path=chart_path,
+                kpis=data["kpis"],
+                fundamentals=data["fundamentals"],
+                news_items=data["news_items"],
+                sentiment_summary=data["sentiment_summary"],
+                chart_path=data["chart_path"],
                 start_date=start_date,
                 end_date=end_date
             )
 
-            print("\n📄 Step 4: Creating PDF...")
-            pdf_path = self.pdf.generate_pdf(
-                report_text=report_text,
-                chart_path=chart_path,
-                stock_symbol=stock_symbol
+            print("\n📄 Step 3: Creating PDF...")
+            pdf_bytes = await asyncio.wrap_future(
+                self.submit_pdf(report_text, data["chart_path"], stock_symbol)
             )
+            result = {
+                **data,
+                "report_text": report_text,
+                "pdf_bytes": pdf_bytes
+            }
+            if persist_pdf:
+                result["pdf_path"] = await asyncio.to_thread(self.pdf.save_pdf, pdf_bytes, stock_symbol)
 
             print("\n🎉 DONE. Full pipeline completed successfully.")
 
-            return {
-                "kpis": kpis,
-                "fundamentals": fundamentals,
-                "chart_path": chart_path,
-                "news_items": news_items,
-                "sentiment_summary": sentiment_summary,
-                "report_text": report_text,
-                "pdf_path": pdf_path
-            }
+            return result
 
         except Exception as e:
             print("\n❌ ERROR OCCURRED!")
             traceback.print_exc()
             return {"error": str(e)}
 
+    def gather(self, stock_symbol: str, start_date: str, end_date: str) -> dict:
+        """
+        Runs only the data stage (news, sentiment, KPIs, fundamentals, chart).
+        Unlike `run`, errors are raised to the caller.
+        """
+        return asyncio.run(self.agather(stock_symbol, start_date, end_date))
+
+    async def agather(self, stock_symbol: str, start_date: str, end_date: str) -> dict:
+        print("\n🔍 Step 1: Fetching news and stock data & KPIs...")
+        # Fan out: neither stage needs the other's output
+        news_items, analysis = await asyncio.gather(
+            self.researcher.agather_news(stock_symbol),
+            self.analyst.aanalyze_stock(stock_symbol, start_date, end_date),
+        )
+        sentiment_summary = self.researcher.analyze_sentiment_summary(news_items)
+
+        return {
+            "kpis": analysis["kpis"],
+            "fundamentals": analysis["fundamentals"],
+            "chart_path": analysis["chart_path"],
+            "figure": analysis["figure"],
+            "news_items": news_items,
+            "sentiment_summary": sentiment_summary,
+        }
+
+    def submit_pdf(self, report_text: str, chart_path: str, stock_symbol: str) -> Future:
+        """
+        Starts rendering the PDF on the worker thread and returns at once.
+        The future resolves to the PDF bytes (or raises the generator's error).
+        """
+        return self._pdf_pool.submit(
+            self.pdf.generate_pdf,
+            report_text=report_text,
+            chart_path=chart_path,
+            stock_symbol=stock_symbol
+        )
+
+    def stream_report(
+        self, stock_symbol: str, start_date: str, end_date: str, data: dict
+    ) -> Iterator[str]:
+        """
+        Streams the report for the output of `gather` chunk by chunk,
+        so the UI can render it while the LLM is still generating.
+        """
+        return self.writer.stream_report(
+            stock_symbol=stock_symbol,
+            kpis=data["kpis"],
+            fundamentals=data["fundamentals"],
+            news_items=data["news_items"],
+            sentiment_summary=data["sentiment_summary"],
+            chart_path=data["chart_path"],
+            start_date=start_date,
+            end_date=end_date
+        )
+
 
 # Allow direct terminal testing
 if __name__ == "__main__":
@@ -92,8 +152,16 @@ if __name__ == "__main__":
     output = orch.run(
         stock_symbol="TCS.NS",
         start_date="2024-01-01",
-        end_date="2024-12-31"
+        end_date="2024-12-31",
+        persist_pdf=True
     )
 
+    # Large or unprintable values are summarised, not dumped
+    pdf_bytes = output.pop("pdf_bytes", None)
+    output.pop("figure", None)
     print("\n\nOUTPUT SUMMARY:\n", output)
+    if pdf_bytes:
+        print(f"\nPDF: {len(pdf_bytes)} bytes")
+    if "pdf_path" in output:
+        print("PDF saved at:", output["pdf_path"])
 
@@ -0,0 +1,88 @@
+# utils/cache.py
+import hashlib
+import inspect
+import json
+import os
+import time
+from functools import wraps
+
+import pandas as pd
+
+
+class FileCache:
+    """
+    On-disk cache shared across processes and restarts.
+    Entries live at `{root}/{md5(symbol)}/{endpoint}_{md5(params)}.pkl|json`
+    (symbols are user input, so they are hashed rather than used as a path):
+    DataFrames are pickled (dtypes and index round-trip exactly),
+    dicts are stored as JSON. An entry older than the TTL is a miss.
+    """
+
+    def __init__(self, root=".cache"):
+        self.root = root
+
+    def _path(self, symbol: str, endpoint: str, params, ext: str) -> str:
+        folder = hashlib.md5(symbol.encode("utf-8")).hexdigest()
+        digest = hashlib.md5(repr(params).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, folder, f"{endpoint}_{digest}.{ext}")
+
+    def get(self, symbol: str, endpoint: str, params, ttl_seconds: float):
+        for ext in ("pkl", "json"):
+            path = self._path(symbol, endpoint, params, ext)
+            try:
+                if time.time() - os.path.getmtime(path) > ttl_seconds:
+                    return None
+                if ext == "pkl":
+                    return pd.read_pickle(path)
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                return None  # unreadable entry: refetch and overwrite it
+        return None
+
+    def set(self, symbol: str, endpoint: str, params, value) -> None:
+        ext = "pkl" if isinstance(value, pd.DataFrame) else "json"
+        path = self._path(symbol, endpoint, params, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename, so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        if ext == "pkl":
+            value.to_pickle(tmp_path)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+        os.replace(tmp_path, path)
+
+
+_default_cache = FileCache()
+
+
+def cached(endpoint: str, ttl_days: float, cache: FileCache = None):
+    """
+    Decorator for fetchers shaped `func(symbol, ...)`. The remaining
+    arguments (defaults included) form the cache key; the wrapped call
+    only runs on a miss or expired entry. Exceptions are not cached.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        ttl_seconds = ttl_days * 24 * 3600
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            symbol, *params = bound.arguments.values()
+
+            store = cache or _default_cache
+            value = store.get(symbol, endpoint, tuple(params), ttl_seconds)
+            if value is None:
+                value = func(*args, **kwargs)
+                store.set(symbol, endpoint, tuple(params), value)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -1,31 +1,130 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import os
-import matplotlib.pyplot as plt
+import threading
+from datetime import date
+from functools import lru_cache
+
+from utils.cache import cached
 
 
 # ----------------------------------------------------
 # 1. Fetch OHLCV Historical Prices + Add Indicators
 # ----------------------------------------------------
-def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-    df = yf.download(symbol, start=start_date, end=end_date, auto_adjust=True)
+def fetch_stock_data(symbol: str, start_date: str, end_date: str, indicators: bool = True) -> pd.DataFrame:
+    # yfinance's end is exclusive, so a range ending before today is final:
+    # reuse the day's first download. Callers get a copy they are free to modify.
+    if _is_past(end_date):
+        df = _cached_stock_data(symbol, start_date, end_date, date.today().isoformat()).copy()
+    else:
+        df = _load_stock_data(symbol, start_date, end_date)
+
+    # Full-length MA/Volatility series are only needed for charting;
+    # extract_kpis falls back to tail slices without them
+    return compute_indicators(df) if indicators else df
+
+
+def _is_past(day: str) -> bool:
+    try:
+        return date.fromisoformat(str(day)) < date.today()
+    except ValueError:
+        return False
+
+
+# Keyed by day as well, so a long-running process still goes back to the
+# disk entry once a day and its TTL takes effect
+@lru_cache(maxsize=64)
+def _cached_stock_data(symbol: str, start_date: str, end_date: str, day: str) -> pd.DataFrame:
+    return _stored_stock_data(symbol, start_date, end_date)
+
+
+# Survives restarts; the TTL picks up retroactive dividend/split adjustments
+@cached("history_indexed", ttl_days=1)
+def _stored_stock_data(symbol: str, start_date: str, end_date: str, auto_adjust: bool = True) -> pd.DataFrame:
+    return _load_stock_data(symbol, start_date, end_date, auto_adjust)
+
+
+def _load_stock_data(symbol: str, start_date: str, end_date: str, auto_adjust: bool = True) -> pd.DataFrame:
+    df = yf.download(symbol, start=start_date, end=end_date, auto_adjust=auto_adjust, progress=False)
 
     if df.empty:
         raise ValueError(f"No stock data found for {symbol}")
 
-    # Reset index for easier manipulation
-    df = df.reset_index()
+    # Recent yfinance returns (Price, Ticker) columns even for one symbol
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    # Dates stay as the DatetimeIndex: no reset_index copy
+    return _select_prices(df)
+
+
+# Drop the columns nothing downstream reads. Prices stay float64: KPIs are
+# reported to 4 decimals, beyond float32's ~7 significant digits
+_PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _select_prices(df: pd.DataFrame) -> pd.DataFrame:
+    return df[_PRICE_COLUMNS]
+
+
+# ----------------------------------------------------
+# 1a. Watchlists: one batched download for many symbols
+# ----------------------------------------------------
+def fetch_stocks_data(symbols: list, start_date: str, end_date: str) -> dict:
+    """
+    Returns {symbol: DataFrame} shaped like `fetch_stock_data` output, keyed by
+    the upper-cased symbol. yfinance fetches the symbols on its own thread pool
+    in a single call. Symbols with no data are left out.
+    """
+    # yfinance upper-cases tickers in its result: look them up the same way
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+
+    raw = yf.download(
+        symbols,
+        start=start_date,
+        end=end_date,
+        auto_adjust=True,
+        group_by="ticker",
+        threads=True,
+        progress=False,
+    )
+
+    if raw.empty:
+        raise ValueError(f"No stock data found for {', '.join(symbols)}")
+
+    # Older yfinance returns flat columns when only one symbol is requested
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw = pd.concat({symbols[0]: raw}, axis=1)
+
+    frames = {}
+    available = set(raw.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        # Calendars differ across exchanges: drop the other symbols' trading days
+        df = raw[symbol].dropna(how="all")
+        if df.empty:
+            continue
+        frames[symbol] = compute_indicators(_select_prices(df))
+
+    return frames
+
+
+# ----------------------------------------------------
+# 1b. Indicators: MA20 / MA50 / Volatility (20-day Std Dev)
+# ----------------------------------------------------
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    # Deferred so importing this module does not pay numba's start-up cost
+    from utils.kpi_numba import moving_stats
 
-    # -------------------------
-    # Add Indicators (MA20/MA50)
-    # -------------------------
-    df["MA20"] = df["Close"].rolling(window=20).mean()
-    df["MA50"] = df["Close"].rolling(window=50).mean()
+    # Single O(N) Numba pass instead of three pandas rolling windows
+    close = df["Close"].to_numpy(dtype=np.float64)
+    ma20, ma50, volatility = moving_stats(close, 20, 50)
 
-    # -------------------------
-    # Volatility (20-day Std Dev)
-    # -------------------------
-    df["Volatility"] = df["Close"].rolling(window=20).std()
+    df["MA20"] = ma20
+    df["MA50"] = ma50
+    df["Volatility"] = volatility
 
     return df
 
@@ -33,63 +132,99 @@ def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> pd.DataFram
 # ----------------------------------------------------
 # 2. Compute KPIs Safely (Avoid Series ambiguity)
 # ----------------------------------------------------
+_KPI_COLUMNS = ["Close", "High", "Low", "MA20", "MA50", "Volatility"]
+_KPI_KEYS = ["current_price", "day_high", "day_low", "ma20", "ma50", "volatility"]
+
+
 def extract_kpis(df):
     if df is None or df.empty:
-        return {
-            "current_price": None,
-            "day_high": None,
-            "day_low": None,
-            "ma20": None,
-            "ma50": None,
-            "volatility": None
-        }
+        return dict.fromkeys(_KPI_KEYS)
 
     latest = df.iloc[-1]  # last row
 
-    def safe_scalar(val):
-        """Ensure the KPI value is always a scalar float."""
-        if hasattr(val, "__len__") and not isinstance(val, (float, int)):
-            val = val.iloc[-1]  # take last element if Series
-
-        if pd.isna(val):
-            return None
-
-        return round(float(val), 4)
+    # Without the indicator columns only the trailing windows are evaluated
+    if "MA20" in df.columns:
+        values = np.array([latest[col] for col in _KPI_COLUMNS], dtype=np.float64)
+    else:
+        close = df["Close"].to_numpy(dtype=np.float64)
+        values = np.array([
+            latest["Close"],
+            latest["High"],
+            latest["Low"],
+            close[-20:].mean() if len(close) >= 20 else np.nan,
+            close[-50:].mean() if len(close) >= 50 else np.nan,
+            close[-20:].std(ddof=1) if len(close) >= 20 else np.nan,
+        ], dtype=np.float64)
 
-    return {
-        "current_price": safe_scalar(latest["Close"]),
-        "day_high": safe_scalar(latest["High"]),
-        "day_low": safe_scalar(latest["Low"]),
-        "ma20": safe_scalar(latest["MA20"]),
-        "ma50": safe_scalar(latest["MA50"]),
-        "volatility": safe_scalar(latest["Volatility"]),
-    }
+    # One vectorized rounding pass; NaN (window not yet full) becomes None
+    values = np.round(values, 4)
+    return {key: None if np.isnan(v) else float(v) for key, v in zip(_KPI_KEYS, values)}
 
 
 # ----------------------------------------------------
-# 3. Price Chart PNG Generator
+# 3. Price Chart JPEG Generator
 # ----------------------------------------------------
+CHART_MAX_POINTS = 1000
+
+
 def create_price_chart(df: pd.DataFrame, symbol: str) -> str:
+    # Deferred: Matplotlib's import and font-manager setup is only paid when a chart is drawn.
+    # The font cache lives in the project dir, so a fresh container builds it once
+    # and every later start reuses it instead of rescanning system fonts.
+    os.environ.setdefault("MPLCONFIGDIR", os.path.abspath(".mplcache"))
+    import matplotlib
+    import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Bundled with Matplotlib: no font fallback search, no LaTeX
+    matplotlib.rcParams.update({"font.family": "DejaVu Sans", "text.usetex": False})
+
+    # Named by the date span it plots: a report built later for another range
+    # of the same symbol never picks up this chart
     os.makedirs("data/raw", exist_ok=True)
-    chart_path = f"data/raw/{symbol}_chart.png"
+    chart_path = f"data/raw/{symbol}_{df.index[0]:%Y-%m-%d}_{df.index[-1]:%Y-%m-%d}_chart.jpg"
+
+    # Convert dates to Matplotlib floats once, not once per plotted line
+    dates = mdates.date2num(df.index)
+    close = df["Close"].to_numpy()
+    lines = {col: df[col].to_numpy() for col in ("MA20", "MA50") if col in df.columns}
+
+    # A 1000px-wide chart cannot show more points than that: long histories are
+    # downsampled (LTTB on Close, same points kept for the MAs) before rasterizing
+    if len(df) > CHART_MAX_POINTS * 2:
+        from utils.lttb import lttb_indices
+        keep = lttb_indices(dates, close, CHART_MAX_POINTS)
+        dates, close = dates[keep], close[keep]
+        lines = {col: values[keep] for col, values in lines.items()}
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(df["Date"], df["Close"], label="Close Price")
+    # Object-oriented API on an Agg canvas: no pyplot global state, so charts
+    # can be rendered from several threads at once
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.plot(dates, close, label="Close Price")
 
     # Add MAs if present
-    if "MA20" in df.columns:
-        plt.plot(df["Date"], df["MA20"], label="MA20")
-    if "MA50" in df.columns:
-        plt.plot(df["Date"], df["MA50"], label="MA50")
-
-    plt.title(f"{symbol} Price Chart")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(chart_path)
-    plt.close()
+    for col, values in lines.items():
+        ax.plot(dates, values, label=col)
+
+    ax.xaxis_date()
+
+    ax.set_title(f"{symbol} Price Chart")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Price")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    # Only embedded in the PDF; the UI uses the Plotly figure. JPEG is embedded
+    # by FPDF as-is (DCTDecode), where a PNG is decoded and re-compressed
+    # Write then rename, so a session rendering the same chart never leaves
+    # another one reading a half-written file
+    tmp_path = f"{chart_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fig.savefig(tmp_path, format="jpeg", dpi=100, bbox_inches="tight",
+                pil_kwargs={"quality": 85, "optimize": True})
+    os.replace(tmp_path, chart_path)
 
     return chart_path
 
@@ -98,14 +233,25 @@ def create_price_chart(df: pd.DataFrame, symbol: str) -> str:
 # 4. Fetch Company Fundamentals (P/E, EPS, MarketCap…)
 # ----------------------------------------------------
 def fetch_fundamentals(symbol: str) -> dict:
-    ticker = yf.Ticker(symbol)
-
+    # Fundamentals change at most daily: one .info lookup per symbol per day.
+    # Yahoo symbols are case-insensitive, so "tcs.ns" shares the "TCS.NS" entry.
     try:
-        info = ticker.info  # (yfinance fundamentals)
+        return dict(_cached_fundamentals(symbol.strip().upper(), date.today().isoformat()))
     except Exception:
         return {}
 
-    fundamentals = {
+
+@lru_cache(maxsize=256)
+def _cached_fundamentals(symbol: str, day: str) -> dict:
+    return _stored_fundamentals(symbol)
+
+
+# Raises on failure, so failed lookups are cached neither on disk nor in memory
+@cached("fundamentals", ttl_days=1)
+def _stored_fundamentals(symbol: str) -> dict:
+    info = yf.Ticker(symbol).info  # (yfinance fundamentals)
+
+    return {
         "market_cap": info.get("marketCap"),
         "pe_ratio": info.get("trailingPE"),
         "forward_pe": info.get("forwardPE"),
@@ -116,9 +262,3 @@ def fetch_fundamentals(symbol: str) -> dict:
         "sector": info.get("sector"),
         "industry": info.get("industry"),
     }
-
-    return fundamentals
-
-
-
-
@@ -0,0 +1,31 @@
+# utils/http_session.py
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_connections: int = 4, pool_maxsize: int = 8) -> requests.Session:
+    """
+    Return a requests.Session that keeps connections alive in a urllib3 pool
+    and retries rate-limit / transient server errors with backoff.
+    Agents hold one session each so repeated calls skip the TCP+TLS handshake.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+        read=0,  # a read timeout may follow a processed POST: never resend a paid LLM call
+        raise_on_status=False,  # hand the last response back so callers can report it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
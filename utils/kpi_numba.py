@@ -0,0 +1,75 @@
+# utils/kpi_numba.py
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def moving_stats(close: np.ndarray, w1: int, w2: int):
+    """
+    One pass over `close` producing:
+      - ma1: w1-day moving average
+      - ma2: w2-day moving average
+      - vol: w1-day rolling standard deviation (ddof=1)
+
+    Running sums are updated add-new / subtract-old, so the cost is O(N)
+    regardless of window size. Values are centred on the first price to keep
+    the sum of squares well conditioned. Like pandas' rolling(window), a
+    window containing NaN (or not yet full) yields NaN.
+
+    Releases the GIL, so analyst threads can run it side by side.
+    """
+    n = close.shape[0]
+    ma1 = np.full(n, np.nan)
+    ma2 = np.full(n, np.nan)
+    vol = np.full(n, np.nan)
+
+    shift = 0.0
+    for i in range(n):
+        if not np.isnan(close[i]):
+            shift = close[i]
+            break
+
+    s1 = 0.0
+    ss1 = 0.0
+    s2 = 0.0
+    nan1 = 0
+    nan2 = 0
+
+    for i in range(n):
+        v = close[i]
+        if np.isnan(v):
+            nan1 += 1
+            nan2 += 1
+        else:
+            x = v - shift
+            s1 += x
+            ss1 += x * x
+            s2 += x
+
+        if i >= w1:
+            old = close[i - w1]
+            if np.isnan(old):
+                nan1 -= 1
+            else:
+                y = old - shift
+                s1 -= y
+                ss1 -= y * y
+
+        if i >= w2:
+            old = close[i - w2]
+            if np.isnan(old):
+                nan2 -= 1
+            else:
+                s2 -= old - shift
+
+        if i >= w1 - 1 and nan1 == 0:
+            mean = s1 / w1
+            ma1[i] = mean + shift
+            if w1 > 1:
+                var = (ss1 - s1 * mean) / (w1 - 1)
+                vol[i] = np.sqrt(var) if var > 0.0 else 0.0
+
+        if i >= w2 - 1 and nan2 == 0:
+            ma2[i] = s2 / w2 + shift
+
+    return ma1, ma2, vol
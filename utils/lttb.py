@@ -0,0 +1,67 @@
+# utils/lttb.py
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling of the line (x, y).
+
+    Returns the indices of the `n_out` points to keep (always including the
+    first and last), so companion series can be sliced with the same
+    selection. Each bucket keeps the point forming the largest triangle
+    with the previously kept point and the next bucket's average, which
+    preserves the peaks and troughs a plot is read for. Points with NaN y
+    are only kept when a whole bucket is NaN.
+    """
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+
+    # Interior points split into n_out - 2 buckets
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        nxt_start = end
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        if nxt_start >= nxt_end:
+            nxt_start = n - 1
+            nxt_end = n
+        avg_x = 0.0
+        avg_y = 0.0
+        count = 0
+        for j in range(nxt_start, nxt_end):
+            if not np.isnan(y[j]):
+                avg_x += x[j]
+                avg_y += y[j]
+                count += 1
+        if count > 0:
+            avg_x /= count
+            avg_y /= count
+        else:
+            avg_x = x[nxt_end - 1]
+            avg_y = y[a]
+
+        ax = x[a]
+        ay = y[a]
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        out[i + 1] = best
+        a = best
+
+    return out
@@ -1,41 +1,35 @@
-from fpdf import FPDF
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
+from importlib.util import find_spec
 
-def clean_text(text: str) -> str:
-    """
-    Replace unicode characters unsupported by FPDF with safe ASCII equivalents.
-    Prevents UnicodeEncodeError (FPDF uses Latin-1 internally).
-    """
-    replacements = {
-        # Dashes & bullets
-        "–": "-",   
-        "—": "-",   
-        "•": "*",
-        "…": "...",
-
-        # Quotes
-        "“": "\"",
-        "”": "\"",
-        "‘": "'",
-        "’": "'",
+# Numbered section headings ("1. Executive Summary" .. "8. Final Recommendation"),
+# printed in bold. Matched once per line with no strip() copy; a decimal such
+# as "1.5% gain" opening a body line is not a heading.
+_HEAD = re.compile(r"\s*[1-8]\.(?!\d)")
 
-        # Symbols & shapes
-        "○": "o",
+# DejaVu Sans ships with Matplotlib (already a dependency). As a Unicode TTF
+# it renders dashes, quotes and arrows as-is, so the text needs no Latin-1 pass.
+_FONT_FILES = {
+    "": "DejaVuSans.ttf",
+    "B": "DejaVuSans-Bold.ttf",
+    "I": "DejaVuSans-Oblique.ttf",
+}
 
-        # Arrows
-        "→": "->",
-        "←": "<-",
-        "↔": "<->",
-        "⇒": "=>",
-        "⇐": "<=",
-    }
+# Parsing a TTF is the costly part of add_font: register the rarely used
+# italic face only when it is needed
+_EAGER_STYLES = ("", "B")
 
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
-
-    return text
 
+# Resolved on the first render, not at construction, and located through the
+# package spec: importing matplotlib here would set up its config and font
+# cache before create_price_chart has pointed MPLCONFIGDIR at the project dir
+@lru_cache(maxsize=1)
+def _font_paths() -> dict:
+    package_dir = find_spec("matplotlib").submodule_search_locations[0]
+    font_dir = os.path.join(package_dir, "mpl-data", "fonts", "ttf")
+    return {style: os.path.join(font_dir, name) for style, name in _FONT_FILES.items()}
 
 
 class PDFGenerator:
@@ -51,21 +45,31 @@ class PDFGenerator:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def generate_pdf(self, report_text: str, chart_path: str, stock_symbol: str) -> str:
+    def generate_pdf(self, report_text: str, chart_path: str, stock_symbol: str) -> bytes:
+        """
+        Renders the report in memory and returns the PDF bytes.
+        `save_pdf` writes them to `output_dir` when a copy on disk is wanted.
+        """
+        # Deferred: fpdf is only imported when a report is rendered
+        from fpdf import FPDF
+        from fpdf.enums import XPos, YPos
 
+        fonts = _font_paths()
         pdf = FPDF()
+        for style in _EAGER_STYLES:
+            pdf.add_font("DejaVu", style, fonts[style])
         pdf.set_auto_page_break(auto=True, margin=15)
         pdf.add_page()
 
         # ---------- Title ----------
-        pdf.set_font("Arial", "B", 18)
-        pdf.cell(0, 10, clean_text(f"Financial Analysis Report: {stock_symbol}"), ln=True)
+        pdf.set_font("DejaVu", "B", 18)
+        pdf.cell(0, 10, f"Financial Analysis Report: {stock_symbol}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.ln(4)
 
         # ---------- Date ----------
-        pdf.set_font("Arial", "", 12)
+        pdf.set_font("DejaVu", "", 12)
         date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
-        pdf.cell(0, 10, clean_text(f"Generated on: {date_str}"), ln=True)
+        pdf.cell(0, 10, f"Generated on: {date_str}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.ln(8)
 
         # ---------- Chart ----------
@@ -75,33 +79,47 @@ class PDFGenerator:
                 pdf.ln(10)
             except Exception:
                 pdf.ln(5)
-                pdf.set_font("Arial", "I", 11)
+                pdf.add_font("DejaVu", "I", fonts["I"])
+                pdf.set_font("DejaVu", "I", 11)
                 pdf.set_text_color(255, 0, 0)
-                pdf.cell(0, 10, "Chart could not be loaded.", ln=True)
+                pdf.cell(0, 10, "Chart could not be loaded.", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 pdf.set_text_color(0, 0, 0)
                 pdf.ln(5)
 
         # ---------- Report Body ----------
-        pdf.set_font("Arial", "", 12)
-
-        # Clean entire text before printing
-        processed_text = clean_text(report_text)
+        pdf.set_font("DejaVu", "", 12)
 
-        for line in processed_text.split("\n"):
+        # Consecutive body lines go out in one multi_cell call; FPDF breaks
+        # them on "\n" itself, so the layout matches one call per line
+        body = []
+        for line in report_text.split("\n"):
 
             # Section headings (bold)
-            if line.strip().startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.")):
-                pdf.set_font("Arial", "B", 13)
-                pdf.multi_cell(0, 8, clean_text(line))
-                pdf.set_font("Arial", "", 12)
+            if _HEAD.match(line):
+                if body:
+                    pdf.multi_cell(0, 7, "\n".join(body), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                    body = []
+                pdf.set_font("DejaVu", "B", 13)
+                pdf.multi_cell(0, 8, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.set_font("DejaVu", "", 12)
             else:
-                pdf.multi_cell(0, 7, clean_text(line))
+                body.append(line)
 
-        # ---------- Save PDF ----------
+        if body:
+            pdf.multi_cell(0, 7, "\n".join(body), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        # ---------- Output PDF ----------
+        # fpdf2 builds the document in memory; no file round-trip for the download
+        return bytes(pdf.output())
+
+    def save_pdf(self, pdf_bytes: bytes, stock_symbol: str) -> str:
+        """
+        Writes rendered PDF bytes to `output_dir` and returns the file path.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{self.output_dir}/REPORT_{stock_symbol}_{timestamp}.pdf"
-        pdf.output(filename)
-
+        with open(filename, "wb") as f:
+            f.write(pdf_bytes)
         return filename
 
 
@@ -118,11 +136,10 @@ This is a test report – with unicode… and fancy “quotes”.
 - MA20: 4010
 """
 
-    out = g.generate_pdf(
+    pdf_bytes = g.generate_pdf(
         report_text=sample_text,
-        chart_path="data/raw/TCS.NS_chart.png",
-        stock_symbol="TCS.NS"
+        chart_path="data/raw/TCS.NS_2024-01-01_2024-12-30_chart.jpg",
+        stock_symbol="TCS.NS",
     )
-
-    print("PDF saved at:", out)
+    print("PDF saved at:", g.save_pdf(pdf_bytes, "TCS.NS"))
 
@@ -1,5 +1,16 @@
 # utils/sentiment_analysis.py
-from textblob import TextBlob
+from functools import lru_cache
+from typing import List
+
+
+# TextBlob's default analyzer, built once and shared. Scoring through it
+# directly skips constructing (and lower-casing/stripping) a TextBlob per text.
+# Deferred: textblob is only imported when the first text is scored.
+@lru_cache(maxsize=1)
+def _analyzer():
+    from textblob.sentiments import PatternAnalyzer
+    return PatternAnalyzer()
+
 
 def simple_sentiment(text: str) -> dict:
     """
@@ -11,15 +22,24 @@ def simple_sentiment(text: str) -> dict:
     if not text:
         return {"polarity": 0.0, "subjectivity": 0.0, "label": "neutral"}
 
-    blob = TextBlob(text)
-    polarity = round(blob.sentiment.polarity, 4)
-    subjectivity = round(blob.sentiment.subjectivity, 4)
+    sentiment = _analyzer().analyze(text)
+    polarity = round(sentiment.polarity, 4)
+    subjectivity = round(sentiment.subjectivity, 4)
+
+    return {"polarity": polarity, "subjectivity": subjectivity, "label": polarity_label(polarity)}
 
+
+def polarity_label(polarity: float) -> str:
+    """Map a -1..1 polarity onto 'positive' | 'negative' | 'neutral'."""
     if polarity > 0.1:
-        label = "positive"
-    elif polarity < -0.1:
-        label = "negative"
-    else:
-        label = "neutral"
+        return "positive"
+    if polarity < -0.1:
+        return "negative"
+    return "neutral"
+
 
-    return {"polarity": polarity, "subjectivity": subjectivity, "label": label}
+def simple_sentiment_batch(texts: List[str]) -> List[dict]:
+    """
+    Score many texts in one call; same output as `simple_sentiment` per text.
+    """
+    return [simple_sentiment(text) for text in texts]
@@ -0,0 +1,51 @@
+# utils/sentiment_batch.py
+import os
+from functools import lru_cache
+from typing import List
+
+from utils.sentiment_analysis import polarity_label, simple_sentiment_batch
+
+# optional: a Hugging Face sentiment model id, e.g.
+# distilbert-base-uncased-finetuned-sst-2-english (needs `transformers` installed).
+# Unset, headlines are scored with TextBlob.
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL")
+
+
+@lru_cache(maxsize=1)
+def _pipeline():
+    # Deferred: loading transformers and the model weights is only paid when used
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL, truncation=True)
+
+
+def score_many(texts: List[str]) -> List[dict]:
+    """
+    Score all texts in one call, in order; same dict shape as `simple_sentiment`.
+    With SENTIMENT_MODEL set the texts go through the model in batches;
+    polarity is P(positive) - P(negative), so a binary (SST-2) or three-class
+    (FinBERT) model both land on -1..1, and it reports no subjectivity (None).
+    Classes named neither positive nor negative (neutral, LABEL_0, ...) add
+    nothing.
+    """
+    if not SENTIMENT_MODEL:
+        return simple_sentiment_batch(texts)
+
+    results = [{"polarity": 0.0, "subjectivity": 0.0, "label": "neutral"} for _ in texts]
+    scored = [i for i, text in enumerate(texts) if text]
+    if not scored:
+        return results
+
+    # top_k=None: every class' probability, not just the winning one
+    outputs = _pipeline()([texts[i] for i in scored], batch_size=16, top_k=None)
+    for i, classes in zip(scored, outputs):
+        polarity = 0.0
+        for c in classes:
+            label = c["label"].lower()
+            if label.startswith("pos"):
+                polarity += c["score"]
+            elif label.startswith("neg"):
+                polarity -= c["score"]
+        polarity = round(polarity, 4)
+        results[i] = {"polarity": polarity, "subjectivity": None, "label": polarity_label(polarity)}
+
+    return results